@@ -1,12 +1,25 @@
 import sys
 import json
 import os
+import bisect
+import hashlib
+import tempfile
+import zipfile
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+import numpy as np
 import fitz  # PyMuPDF
 from PyQt5.QtWidgets import (
-    QApplication, QLabel, QScrollArea, QMainWindow, QFileDialog, QToolBar, QAction
+    QApplication, QWidget, QScrollArea, QMainWindow, QFileDialog, QToolBar, QAction
 )
 from PyQt5.QtGui import QPixmap, QImage, QPainter, QPen, QIcon
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import (
+    Qt, QTimer, QSize, QRect, QLineF, QObject, QRunnable, QThreadPool, pyqtSignal,
+    QPropertyAnimation, QEasingCurve
+)
 
 
 class PDFViewer(QMainWindow):
@@ -21,29 +34,67 @@ class PDFViewer(QMainWindow):
         self.anchor_path = self._make_anchor_filename(pdf_path)
         self.doc = fitz.open(pdf_path)
 
-        self.base_pdf_scale = 2.0     # the scale used to generate base_image
+        self.base_pdf_scale = 2.0     # the scale that defines base-image (anchor) coordinates
         self.user_scale = 1.0         # the zoom factor the UI controls
         self.current_render_scale = self.base_pdf_scale * self.user_scale
+        self.display_scale = self.current_render_scale   # scale the canvas is currently shown at
+        self._pending_top_pdf = None  # PDF Y a queued _restore_top_position will scroll to
+        self._restore_seq = 0
         self.fit_to_width = True
         self.performance_mode = False
-        self.anchors = []
+        self.anchors = []             # kept sorted (bisect), base-image coordinates
+        self._anchors_np = np.empty(0, dtype=np.float64)
+        self._anchors_scaled = np.empty(0, dtype=np.int32)   # anchors in canvas pixels
+        self._anchor_scroll_values = self._anchors_scaled     # scrollbar value per anchor
         self.current_anchor_index = -1
 
-
-        # Render base image (full resolution)
-        self.base_image = self.render_pdf_to_long_image(self.doc)
-        self.image = self.base_image
+        # Page geometry in base-image coordinates (no rasterization needed)
+        self.compute_page_layout(self.doc)
+
+        # Rendered page cache: (page_index, scale_key) -> RGBA pixel array, LRU order
+        self.page_cache = OrderedDict()
+        self.page_cache_size = 20
+        self.prefetch_pages = 1     # extra pages rendered above/below the viewport
+
+        # Rendered pages also persist on disk across sessions (keyed by file version, page, scale)
+        sweep_disk_cache()
+        self.pages_stored = 0          # pages written to the disk cache this session
+        self.disk_cache_dir = disk_cache_dir(pdf_path)
+
+        # Background rasterization in worker processes (threads would not help: get_pixmap()
+        # holds the GIL, and MuPDF's context is global). Results come back via signal.
+        self.render_pool = self.start_render_pool()
+        self.render_signals = RenderSignals()
+        self.render_signals.page_rendered.connect(self.on_page_rendered)
+        self.render_signals.page_failed.connect(self.on_page_failed)
+        self.render_signals.page_stored.connect(self.on_page_stored)
+        self.render_token = RenderToken()
+        self.pending_renders = set()
+        self.render_failures = {}   # (page_index, scale_key) -> failed attempts; given up after 2
+
+        # Zoom/resize re-renders are debounced into one pass at the final scale
+        self._rerender_timer = QTimer(singleShot=True)
+        self._rerender_timer.timeout.connect(self._do_rerender)
+        # True during zoom/scroll gestures: stretched placeholders are drawn nearest-neighbour
+        self._interactive = False
 
         # UI elements
-        self.label = ClickableLabel(self)
-        self.label.setPixmap(QPixmap.fromImage(self.image))
-        self.label.setFocusPolicy(Qt.StrongFocus)
+        self.canvas = PageCanvas(self)
 
         self.scroll_area = QScrollArea()
-        self.scroll_area.setWidget(self.label)
+        self.scroll_area.setWidget(self.canvas)
         self.scroll_area.setWidgetResizable(True)
         self.setCentralWidget(self.scroll_area)
 
+        # Initial fit-to-width zoom from the page sizes alone (nothing is rasterized here).
+        # The one startup render happens on the first resizeEvent, once the viewport has
+        # its real size; only the visible pages are rendered, the rest follow on scroll.
+        self.user_scale = self.scroll_area.viewport().width() / max(1, self.doc_width_base)
+        self.current_render_scale = self.display_scale = self.base_pdf_scale * self.user_scale
+        self.rendered_pages = set()
+        self.update_pixmap()
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.on_scroll)
+
         # Toolbar for zoom/reset
         self.toolbar = QToolBar("Tools")
         self.addToolBar(self.toolbar)
@@ -52,20 +103,19 @@ class PDFViewer(QMainWindow):
         act_fit.triggered.connect(self.reset_zoom)
         self.toolbar.addAction(act_fit)
 
-        # Render zoom cache
-        self.render_cache = {}
 
-
-        # Timer for smooth scroll
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.smooth_scroll)
+        # Smooth scroll: Qt drives the scrollbar value and easing curve itself
+        self._scroll_anim = QPropertyAnimation(self.scroll_area.verticalScrollBar(), b"value")
+        self._scroll_anim.setDuration(200)
+        self._scroll_anim.setEasingCurve(QEasingCurve.OutCubic)
         self.target_y = 0
 
-        # Load anchors automatically if available
-        self.load_anchors()
+        # Anchor files are written on their own single-thread pool, so saves stay in order
+        self.save_pool = QThreadPool()
+        self.save_pool.setMaxThreadCount(1)
 
-        # Draw anchors
-        self.update_pixmap()
+        # Load anchors automatically if available (they are drawn once the window is up)
+        self.load_anchors()
 
 
     def _make_anchor_filename(self, pdf_path):
@@ -73,126 +123,276 @@ class PDFViewer(QMainWindow):
         return f"anchors_{base}.json"
 
     # ---------- PDF Rendering ----------
-    def render_pdf_to_long_image(self, doc):
-        """Render all pages into one tall QImage at base zoom (2.0)."""
-        zoom = 2.0
-        mat = fitz.Matrix(zoom, zoom)
-        images = []
-        widths, heights = [], []
-
+    def compute_page_layout(self, doc):
+        """Compute page sizes and cumulative Y offsets in base-image coordinates."""
+        mat = fitz.Matrix(self.base_pdf_scale, self.base_pdf_scale)
+        self.page_widths = []
+        self.page_heights = []
         for page in doc:
-            pix = page.get_pixmap(matrix=mat)
-            img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
-            images.append(img.copy())
-            widths.append(pix.width)
-            heights.append(pix.height)
-
-        total_height = sum(heights)
-        total_width = max(widths)
-        long_image = QImage(total_width, total_height, QImage.Format_RGB888)
-        long_image.fill(Qt.white)
-
-        painter = QPainter(long_image)
-        y_offset = 0
-        for img in images:
-            painter.drawImage(0, y_offset, img)
-            y_offset += img.height()
+            # same integer size get_pixmap() would produce at base scale
+            rect = page.rect.transform(mat).irect
+            self.page_widths.append(rect.width)
+            self.page_heights.append(rect.height)
+
+        self.page_offsets_base = [0]
+        for h in self.page_heights:
+            self.page_offsets_base.append(self.page_offsets_base[-1] + h)
+        self.doc_width_base = max(self.page_widths)
+        self.doc_height_base = self.page_offsets_base[-1]
+
+    def visible_pages(self, y_top_scaled=None):
+        """Return the range of page indices intersecting the viewport (plus prefetch)."""
+        if y_top_scaled is None:
+            y_top_scaled = self.scroll_area.verticalScrollBar().value()
+        view_h = self.scroll_area.viewport().height()
+        top = y_top_scaled / self.user_scale
+        bottom = (y_top_scaled + view_h) / self.user_scale
+
+        last_page = len(self.page_heights) - 1
+        first = bisect.bisect_right(self.page_offsets_base, top) - 1 - self.prefetch_pages
+        last = bisect.bisect_left(self.page_offsets_base, bottom) - 1 + self.prefetch_pages
+        return range(max(0, first), min(last_page, last) + 1)
+
+    def scale_key(self, render_scale):
+        """Cache key for a render scale. Pages are rasterized at the exact scale they are shown at."""
+        return round(render_scale, 3)
+
+    def cached_page(self, index, scale_key):
+        """Return a QImage view of the cached page, or None if it has not been rendered yet."""
+        key = (index, scale_key)
+        pixels = self.page_cache.get(key)
+        if pixels is None:
+            return None
+        self.page_cache.move_to_end(key)
+        return image_from_array(pixels)
+
+    def placeholder_page(self, index):
+        """Return the most recent cached rendering of a page at any scale, or None."""
+        for (i, _), pixels in reversed(self.page_cache.items()):
+            if i == index:
+                return image_from_array(pixels)
+        return None
+
+    def paint_page(self, index, img, placeholder=False):
+        """Hand one page to the canvas as an opaque QPixmap.
+        Placeholders (a page rendered at another zoom) are stretched by the canvas
+        until MuPDF delivers the page at the exact scale.
+        """
+        pixmap = QPixmap(img.size())
+        pixmap.fill(Qt.white)     # pages are rendered with a transparent background
+        painter = QPainter(pixmap)
+        painter.drawImage(0, 0, img)
         painter.end()
+        self.canvas.set_page(index, pixmap)
+        if not placeholder:
+            self.rendered_pages.add(index)
 
-        return long_image
+    def render_visible_pages(self, y_top_scaled=None):
+        """Paint cached visible pages right away and queue the missing ones on the thread pool.
+        Until a missing page arrives, a cached rendering at another zoom stands in for it.
+        """
+        scale_key = self.scale_key(self.current_render_scale)
+        visible = self.visible_pages(y_top_scaled)
+
+        # only pages near the viewport keep a pixmap; page_cache holds recent pixels
+        for i in self.canvas.loaded_pages().difference(visible):
+            self.canvas.set_page(i, None)
+            self.rendered_pages.discard(i)
+
+        for i in visible:
+            if i in self.rendered_pages:
+                continue
+            img = self.cached_page(i, scale_key)
+            if img is not None:
+                self.paint_page(i, img)
+                continue
+
+            if not self.canvas.has_page(i):
+                stand_in = self.placeholder_page(i)
+                if stand_in is not None:
+                    self.paint_page(i, stand_in, placeholder=True)
+
+            key = (i, scale_key)
+            if key not in self.pending_renders and self.render_failures.get(key, 0) < 2:
+                self.pending_renders.add(key)
+                future = self.submit_render(RenderTask(self.pdf_path, i, scale_key, self.disk_cache_dir))
+                self.render_token.track(future)
+                future.add_done_callback(partial(self.render_signals.deliver, i, scale_key, self.render_token))
+
+    def start_render_pool(self):
+        """Start the worker processes that rasterize pages."""
+        return ProcessPoolExecutor(max_workers=RENDER_WORKERS,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    def submit_render(self, task):
+        """Queue a RenderTask, restarting the workers if one of them has died."""
+        try:
+            return self.render_pool.submit(task.run)
+        except BrokenProcessPool:
+            # a worker was killed (out of memory at high zoom, MuPDF crash on a bad page);
+            # the executor can't be used again, so replace it
+            print("⚠️ A render worker died, restarting the render processes")
+            self.render_pool.shutdown(wait=False, cancel_futures=True)
+            self.render_pool = self.start_render_pool()
+            return self.render_pool.submit(task.run)
+
+    def on_page_rendered(self, index, scale_key, token, pixels):
+        """Slot for RenderTask results (runs on the GUI thread)."""
+        key = (index, scale_key)
+        self.page_cache[key] = pixels
+        if len(self.page_cache) > self.page_cache_size:
+            self.page_cache.popitem(last=False)
+
+        # results for a stale (or pending) zoom level only go into the cache
+        if token is self.render_token and not token.cancelled:
+            self.pending_renders.discard(key)
+            # the view may have scrolled on while the page was rendering in a worker
+            if index not in self.rendered_pages and index in self.visible_pages():
+                self.paint_page(index, image_from_array(pixels))
+
+        if not self.pending_renders:
+            self._interactive = False
+
+    def on_page_failed(self, index, scale_key, token, error):
+        """Slot for RenderTask errors: forget the request so the page can be asked for again."""
+        key = (index, scale_key)
+        print(f"⚠️ Rendering page {index + 1} failed: {error}")
+        self.render_failures[key] = self.render_failures.get(key, 0) + 1
+        if token is self.render_token:
+            self.pending_renders.discard(key)
+            # retry once (e.g. the worker died for another page); a page failing twice is left out
+            if self.render_failures[key] < 2 and index in self.visible_pages():
+                QTimer.singleShot(0, lambda: self.on_scroll(self.scroll_area.verticalScrollBar().value()))
+
+        if not self.pending_renders:
+            self._interactive = False
+
+    def on_page_stored(self):
+        """A worker is writing a page to the disk cache: keep the cache bounded during the session too.
+        Compressed sizes are only known once written, so the sweep re-measures the directory
+        every DISK_CACHE_SWEEP_EVERY pages.
+        """
+        self.pages_stored += 1
+        if self.pages_stored % DISK_CACHE_SWEEP_EVERY == 0:
+            QThreadPool.globalInstance().start(SweepDiskCacheTask(DISK_CACHE_MAX_BYTES))
+
+    def on_scroll(self, value):
+        """Render pages that scrolled into view."""
+        # while a re-render is pending the pages are at the old zoom; _do_rerender catches up
+        if self._rerender_timer.isActive():
+            return
+        self.render_visible_pages(value)
 
-    def render_pdf_scaled(self, doc, render_scale):
-        """Render all pages into one tall QImage at the given MuPDF render_scale."""
-        mat = fitz.Matrix(render_scale, render_scale)
-        images = []
-        widths, heights = [], []
+    def render_pdf_scaled(self, render_scale, y_top_scaled=None):
+        """Switch to render_scale and rasterize only the visible pages at it.
+        Pages already on the canvas stay up as placeholders until their re-render arrives;
+        the rest are filled in by on_scroll() as they come into view.
+        """
+        self.current_render_scale = render_scale
 
-        for page in doc:
-            pix = page.get_pixmap(matrix=mat)
-            img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
-            images.append(img.copy())
-            widths.append(pix.width)
-            heights.append(pix.height)
-
-        total_height = sum(heights)
-        total_width = max(widths)
-        long_image = QImage(total_width, total_height, QImage.Format_RGB888)
-        long_image.fill(Qt.white)
-
-        painter = QPainter(long_image)
-        y_offset = 0
-        for img in images:
-            painter.drawImage(0, y_offset, img)
-            y_offset += img.height()
-        painter.end()
+        # drop queued tasks for the previous zoom level
+        self.render_token.cancel()
+        self.render_token = RenderToken()
+        self.pending_renders = set()
 
-        return long_image
+        self.rendered_pages = set()
+        self.render_visible_pages(y_top_scaled)
 
 
     # ---------- Scaling and Updating ----------
     def update_scaled_image(self):
         """
-        Re-render PDF at current zoom or fit-to-width, keeping the *top line* fixed.
-        Uses explicit render scales to avoid confusion between 'zoom' semantics.
+        Apply the current zoom or fit-to-width, keeping the *top line* fixed.
+        The current page pixmaps are stretched right away as a preview; the MuPDF re-render is
+        debounced so a burst of zoom keys or resize events only re-renders once.
         """
-        sb = self.scroll_area.verticalScrollBar()
-
-        # current render scale (pixels-per-PDF-unit) used to display the current image
-        old_render_scale = getattr(self, "current_render_scale", self.base_pdf_scale * self.user_scale)
-
         # 1) Compute absolute PDF Y coordinate currently at the top of the viewport
-        y_top_scaled = sb.value()               # top of viewport, in *pixels of current image*
-        y_top_pdf = y_top_scaled / old_render_scale if old_render_scale != 0 else 0.0
+        y_top_pdf = self._top_pdf_y()
 
         # 2) Update user_scale if fit-to-width requested
         if self.fit_to_width:
             target_width = self.scroll_area.viewport().width()
-            # base_image.width() equals (pdf_width * base_pdf_scale)
-            # user_scale should be ratio of target_width to base_image width
-            self.user_scale = target_width / max(1, self.base_image.width())
+            # doc_width_base equals (pdf_width * base_pdf_scale)
+            # user_scale should be ratio of target_width to base document width
+            self.user_scale = target_width / max(1, self.doc_width_base)
+
+        # 3) Nothing on screen yet (first show): there is nothing to stretch, render right away
+        if not self.canvas.loaded_pages() and not self.pending_renders:
+            self.update_pixmap()
+            self._do_rerender()
+            return
+
+        # 4) Stop accepting pages at the old zoom and show them stretched until the re-render
+        self._interactive = True
+        self.render_token.cancel()
+        self.update_pixmap()
+        self._restore_top_position(y_top_pdf)
+        self._rerender_timer.start(120)
 
-        # 3) Compute new render scale and re-render
+    def _do_rerender(self):
+        """Re-render the visible pages at the final scale once zooming/resizing has settled."""
         new_render_scale = self.base_pdf_scale * self.user_scale
-        self.current_render_scale = new_render_scale
+        y_top_pdf = self._top_pdf_y()
+        # gesture has settled: placeholders still waiting for MuPDF get the smooth stretch
+        self._interactive = False
+
         print(f"Re-rendering PDF at render_scale={new_render_scale:.3f} (user_scale={self.user_scale:.3f})")
-        self.image = self.render_pdf_scaled(self.doc, new_render_scale)
+        y_top_target = int(round(y_top_pdf * new_render_scale))
+        self.render_pdf_scaled(new_render_scale, y_top_target)
         self.update_pixmap()
+        self._restore_top_position(y_top_pdf)
+
+    def _top_pdf_y(self):
+        """PDF Y at the top of the viewport, honouring a scroll restore that has not run yet."""
+        if self._pending_top_pdf is not None:
+            return self._pending_top_pdf
+        # display_scale is the scale the canvas is shown at; zoom_in/zoom_out
+        # have already changed user_scale by the time this is called
+        return self.scroll_area.verticalScrollBar().value() / self.display_scale
+
+    def _restore_top_position(self, y_top_pdf):
+        """Scroll so that the same PDF Y position stays at top.
+        Runs after layout settles so the scroll range is updated. Clamps to the scrollbar range.
+        """
+        self._pending_top_pdf = y_top_pdf
+        self._restore_seq += 1
+        seq = self._restore_seq
 
-        # 4) After layout settles, restore the vertical scroll so the same PDF Y is at the top.
-        # Use singleShot to ensure scroll ranges updated. Clamp to scrollbar range.
         def _restore():
-            QApplication.processEvents()   # give Qt a chance to update layout and scrollbar ranges
-            sb2 = self.scroll_area.verticalScrollBar()
-            target_scaled = int(round(y_top_pdf * self.current_render_scale))
+            if seq != self._restore_seq:
+                return  # superseded by a later zoom step
+            self._pending_top_pdf = None
+            sb = self.scroll_area.verticalScrollBar()
+            target_scaled = int(round(y_top_pdf * self.base_pdf_scale * self.user_scale))
             # clamp to valid range
-            target_scaled = max(0, min(target_scaled, sb2.maximum()))
-            sb2.setValue(target_scaled)
+            target_scaled = max(0, min(target_scaled, sb.maximum()))
+            sb.setValue(target_scaled)
         QTimer.singleShot(0, _restore)
 
-    def _restore_top_position(self, y_top_base):
-        """Scroll so that the same document Y position stays at top."""
-        sb = self.scroll_area.verticalScrollBar()
-        target_y_scaled = int(y_top_base * self.zoom)
-        sb.setValue(target_y_scaled)
-
     def update_pixmap(self):
-        """Redraw anchors on top of scaled image and refresh immediately."""
-        pixmap = QPixmap.fromImage(self.image.copy())
-        painter = QPainter(pixmap)
-
+        """Hand the page layout at the current zoom and the anchors to the canvas and repaint.
+        While a re-render is pending, the canvas stretches the page pixmaps it already has.
+        """
+        self.display_scale = self.base_pdf_scale * self.user_scale
+        s = self.user_scale
+        self.canvas.set_layout([int(round(y * s)) for y in self.page_offsets_base],
+                               [int(round(w * s)) for w in self.page_widths])
+        self.update_anchor_cache()
+        self.canvas.update()
+
+    def refresh_anchor(self, y):
+        """Repaint only the strip around a single added/removed anchor."""
+        self.update_anchor_cache()
+        self.canvas.update_anchor(int(y * self.user_scale))
+
+    def update_anchor_cache(self):
+        """Scale all anchors to canvas pixels in one vectorized pass (after anchor or zoom changes)."""
+        self._anchors_np = np.asarray(self.anchors, dtype=np.float64)
+        self._anchors_scaled = (self._anchors_np * self.user_scale).astype(np.int32)
+        # canvas y == scrollbar value, so anchor navigation indexes the same buffer
+        self._anchor_scroll_values = self._anchors_scaled
         # only draw anchors if not in performance mode
-        if not getattr(self, "performance_mode", False):
-            pen = QPen(Qt.red, 3)
-            painter.setPen(pen)
-            for y in self.anchors:
-                painter.drawLine(0, int(y * self.user_scale), pixmap.width(), int(y * self.user_scale))
-
-        painter.end()
-        self.label.setPixmap(pixmap)
-        self.label.adjustSize()
-        self.label.update()
-        self.scroll_area.viewport().update()
-        QApplication.processEvents()
+        self.canvas.set_anchors(self._anchors_scaled, not getattr(self, "performance_mode", False))
 
 
 
@@ -205,27 +405,35 @@ class PDFViewer(QMainWindow):
     # ---------- Anchor Management ----------
     def add_anchor(self, y_click):
         """Add anchor at correct Y coordinate (accounting for zoom).
-        IMPORTANT: event.pos().y() is already in the label's content coords,
+        IMPORTANT: event.pos().y() is already in the canvas's content coords,
         so don't add the scrollbar value again.
         """
-        # y_click is already relative to the full label (scaled) coordinates
+        # y_click is already relative to the full canvas (scaled) coordinates
         y_abs = y_click / self.user_scale  # convert back to base-image coords
         # clamp just in case
-        y_abs = max(0, min(self.base_image.height() - 1, y_abs))
-        self.anchors.append(y_abs)
-        self.anchors = sorted(list(set(self.anchors)))
+        y_abs = max(0, min(self.doc_height_base - 1, y_abs))
+        self._insert_anchor(y_abs)
         print(f"Added anchor at base-y={y_abs:.1f} (click scaled-y={y_click})")
-        self.update_pixmap()
+        self.refresh_anchor(y_abs)
+
+    def _insert_anchor(self, y_abs):
+        """Insert into the sorted anchor list, skipping exact duplicates."""
+        idx = bisect.bisect_left(self.anchors, y_abs)
+        if idx == len(self.anchors) or self.anchors[idx] != y_abs:
+            self.anchors.insert(idx, y_abs)
 
     def remove_nearest_anchor(self, y_click):
         """Remove the anchor nearest to the clicked Y position (converted from scaled coords)."""
         if not self.anchors:
             return
         y_abs = y_click / self.user_scale
-        nearest = min(self.anchors, key=lambda a: abs(a - y_abs))
-        self.anchors.remove(nearest)
+        # nearest anchor is one of the two neighbours of the insertion point
+        idx = bisect.bisect_left(self.anchors, y_abs)
+        candidates = range(max(0, idx - 1), min(len(self.anchors), idx + 1))
+        nearest_idx = min(candidates, key=lambda i: abs(self.anchors[i] - y_abs))
+        nearest = self.anchors.pop(nearest_idx)
         print(f"Removed anchor near base-y={y_abs:.1f} (actual {nearest:.1f})")
-        self.update_pixmap()
+        self.refresh_anchor(nearest)
 
 
     def keyPressEvent(self, event):
@@ -272,10 +480,9 @@ class PDFViewer(QMainWindow):
         sb = self.scroll_area.verticalScrollBar()
         y_top_scaled = sb.value()  # top of the viewport in scaled coordinates
         y_abs = y_top_scaled / self.user_scale  # convert to base-image coordinate
-        self.anchors.append(y_abs)
-        self.anchors = sorted(list(set(self.anchors)))
+        self._insert_anchor(y_abs)
         print(f"Added anchor at top of view (base-y={y_abs:.1f})")
-        self.update_pixmap()
+        self.refresh_anchor(y_abs)
 
     def next_anchor(self):
         if not self.anchors:
@@ -298,28 +505,15 @@ class PDFViewer(QMainWindow):
         self.scroll_to_anchor(self.current_anchor_index)
 
     def scroll_to_anchor(self, index):
-        target_y = int(self.anchors[index] * self.user_scale)
         sb = self.scroll_area.verticalScrollBar()
-        self.start_y = sb.value()
-        self.target_y = min(max(0, target_y), sb.maximum())
-
-        # Fewer frames = faster travel; higher speed = snappier feel
-        frames = 30            # ↓ fewer frames (was 20)
-        duration_ms = 200      # total animation time
-        interval = duration_ms / frames
-        self.speed = (self.target_y - self.start_y) / frames
+        # anchors are >= 0; only the bottom needs clamping (the last screen can't scroll further)
+        self.target_y = min(int(self._anchor_scroll_values[index]), sb.maximum())
 
-        self.timer.start(int(interval))
-        print(f"Scrolling quickly to anchor {index}: {target_y/self.user_scale:.1f} (zoom={self.user_scale:.2f})")
-
-    def smooth_scroll(self):
-        sb = self.scroll_area.verticalScrollBar()
-        new_val = sb.value() + self.speed
-        if (self.speed > 0 and new_val >= self.target_y) or (self.speed < 0 and new_val <= self.target_y):
-            sb.setValue(int(self.target_y))
-            self.timer.stop()
-        else:
-            sb.setValue(int(new_val))
+        self._scroll_anim.stop()
+        self._scroll_anim.setStartValue(sb.value())
+        self._scroll_anim.setEndValue(self.target_y)
+        self._scroll_anim.start()
+        print(f"Scrolling quickly to anchor {index}: {self.anchors[index]:.1f} (zoom={self.user_scale:.2f})")
 
     # ---------- Zoom ----------
     def zoom_in(self):
@@ -343,10 +537,9 @@ class PDFViewer(QMainWindow):
 
     # ---------- Save/Load ----------
     def save_anchors(self):
-        """Save anchors automatically to anchors_<pdfname>.json."""
-        with open(self.anchor_path, "w") as f:
-            json.dump(self.anchors, f, indent=2)
-        print(f"💾 Anchors saved to {self.anchor_path}")
+        """Save anchors automatically to anchors_<pdfname>.json (in the background)."""
+        # snapshot the list: the task runs while the user keeps adding/removing anchors
+        self.save_pool.start(SaveAnchorsTask(self.anchor_path, list(self.anchors)))
 
     def load_anchors(self):
         """Load anchors automatically from anchors_<pdfname>.json, if exists."""
@@ -354,12 +547,19 @@ class PDFViewer(QMainWindow):
             print(f"(no anchors file found for {self.pdf_path})")
             return
         with open(self.anchor_path, "r") as f:
-            self.anchors = json.load(f)
+            self.anchors = sorted(json.load(f))
         self.current_anchor_index = -1
         print(f"📂 Loaded {len(self.anchors)} anchors from {self.anchor_path}")
-        self.update_pixmap()
+        # draw them after the window has finished showing and restored its scroll position
+        QTimer.singleShot(0, self.update_pixmap)
 
 
+    def closeEvent(self, event):
+        # let a pending anchor save finish before the process exits
+        self.save_pool.waitForDone()
+        self.render_pool.shutdown(wait=False, cancel_futures=True)
+        super().closeEvent(event)
+
     # ---------- Performance Mode ----------
     def enter_performance_mode(self):
         """Hide anchors and toolbar, disable interactions, go fullscreen."""
@@ -383,11 +583,104 @@ class PDFViewer(QMainWindow):
 
 
 
-class ClickableLabel(QLabel):
+class PageCanvas(QWidget):
+    """Scroll-area widget that paints the page pixmaps intersecting the dirty rect, plus anchor lines.
+    There is no document-sized image: each page is its own QPixmap placed at its Y offset.
+    """
     def __init__(self, parent_viewer):
         super().__init__()
         self.parent_viewer = parent_viewer
         self.setFocusPolicy(Qt.StrongFocus)
+        self.page_pixmaps = []        # QPixmap or None per page (None = not loaded)
+        self.page_y_offsets = [0]     # page tops in canvas pixels, one extra entry for the bottom
+        self.page_widths = []
+        self._loaded = set()          # indices of pages that have a pixmap
+        self._size = QSize(0, 0)
+        self._anchors_ref = np.empty(0, dtype=np.int32)   # sorted anchor y's in canvas pixels
+        self._show_anchors = True
+        self._anchor_lines_cache = None  # QLineF per anchor, rebuilt after anchor/zoom changes
+
+    def sizeHint(self):
+        return self._size
+
+    def minimumSizeHint(self):
+        return self._size
+
+    def set_layout(self, page_y_offsets, page_widths):
+        """Set page positions for the displayed zoom. Page pixmaps at another zoom get stretched."""
+        if len(self.page_pixmaps) != len(page_widths):
+            self.page_pixmaps = [None] * len(page_widths)
+            self._loaded = set()
+        self.page_y_offsets = page_y_offsets
+        self.page_widths = page_widths
+        self._size = QSize(max(page_widths), page_y_offsets[-1])
+        self.setMinimumSize(self._size)
+        self.updateGeometry()
+        self._anchor_lines_cache = None
+
+    def page_rect(self, index):
+        top = self.page_y_offsets[index]
+        return QRect(0, top, self.page_widths[index], self.page_y_offsets[index + 1] - top)
+
+    def loaded_pages(self):
+        return set(self._loaded)
+
+    def has_page(self, index):
+        return self.page_pixmaps[index] is not None
+
+    def set_page(self, index, pixmap):
+        """Show pixmap for a page (None unloads it) and repaint just that page."""
+        self.page_pixmaps[index] = pixmap
+        if pixmap is None:
+            self._loaded.discard(index)
+        else:
+            self._loaded.add(index)
+        self.update(self.page_rect(index))
+
+    def set_anchors(self, anchors_scaled, show):
+        self._anchors_ref = anchors_scaled
+        self._show_anchors = show
+        self._anchor_lines_cache = None
+
+    def _anchor_lines(self):
+        if self._anchor_lines_cache is None:
+            width = self._size.width()
+            self._anchor_lines_cache = [QLineF(0, y, width, y) for y in self._anchors_ref.tolist()]
+        return self._anchor_lines_cache
+
+    def update_anchor(self, y_scaled):
+        """Schedule a repaint of the strip covering the anchor line at canvas-y."""
+        self.update(QRect(0, y_scaled - 2, self.width(), 5))
+
+    def paintEvent(self, event):
+        rect = event.rect()
+        painter = QPainter(self)
+
+        # pages intersecting the dirty rect (binary search on page tops)
+        first = max(0, bisect.bisect_right(self.page_y_offsets, rect.top()) - 1)
+        last = min(len(self.page_pixmaps) - 1, bisect.bisect_right(self.page_y_offsets, rect.bottom()) - 1)
+        for i in range(first, last + 1):
+            target = self.page_rect(i)
+            pixmap = self.page_pixmaps[i]
+            if pixmap is None:
+                painter.fillRect(target, Qt.white)
+            elif abs(pixmap.width() - target.width()) <= 1 and abs(pixmap.height() - target.height()) <= 1:
+                painter.drawPixmap(target.topLeft(), pixmap)
+            else:
+                # page from another zoom level, stretched until the re-render arrives:
+                # nearest-neighbour while zooming/scrolling, bilinear once things settle
+                painter.setRenderHint(QPainter.SmoothPixmapTransform, not self.parent_viewer._interactive)
+                painter.drawPixmap(target, pixmap)
+
+        if self._show_anchors and len(self._anchors_ref):
+            # only anchors whose scaled y falls into the dirty rect
+            lo = int(np.searchsorted(self._anchors_ref, rect.top() - 2, side="left"))
+            hi = int(np.searchsorted(self._anchors_ref, rect.bottom() + 2, side="right"))
+            # common case: none in view, so skip the pen setup and the QLineF list (re)build
+            if lo < hi:
+                painter.setPen(QPen(Qt.red, 3))
+                painter.drawLines(self._anchor_lines()[lo:hi])
+        painter.end()
 
     def mousePressEvent(self, event):
         if getattr(self.parent_viewer, "performance_mode", False):
@@ -403,6 +696,224 @@ class ClickableLabel(QLabel):
     def keyPressEvent(self, event):
         self.parent_viewer.keyPressEvent(event)
 
+    def wheelEvent(self, event):
+        # scroll gesture: keep placeholder stretching cheap until the renders catch up
+        self.parent_viewer._interactive = True
+        super().wheelEvent(event)
+
+
+# ---------- Background page rendering ----------
+# Pages are rasterized in separate processes: PyMuPDF keeps the GIL for the whole of
+# get_pixmap() and does not support rendering from several threads at once.
+RENDER_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+_worker_docs = {}          # per worker process: pdf_path -> fitz.Document
+_worker_last_scale = None  # scale of the previous page this worker rendered
+_worker_disk_writer = None  # per worker process: thread that writes pages to the disk cache
+
+DISK_CACHE_ROOT = os.path.join(tempfile.gettempdir(), "pdfviewer_cache")
+DISK_CACHE_MAX_BYTES = 512 * 1024 * 1024   # typical score pages compress to well under 1 MB
+DISK_CACHE_SWEEP_EVERY = 25                # pages stored between in-session sweeps
+
+
+def disk_cache_dir(pdf_path):
+    """Per-document page cache directory. Editing the PDF changes its mtime and so the directory.
+    Returns None (disk cache disabled) if the directory can't be created.
+    """
+    key = f"{os.path.abspath(pdf_path)}|{os.path.getmtime(pdf_path)}"
+    path = os.path.join(DISK_CACHE_ROOT, hashlib.sha1(key.encode("utf-8")).hexdigest())
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        return None
+    return path
+
+
+def sweep_disk_cache(root=DISK_CACHE_ROOT, max_bytes=DISK_CACHE_MAX_BYTES):
+    """Delete the least recently used page files until the whole cache fits in max_bytes.
+    Returns the number of bytes left in the cache.
+    """
+    entries = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_atime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    if removed:
+        print(f"🧹 Removed {removed} old pages from the render cache ({total / 2**20:.0f} MB left)")
+    return total
+
+
+def image_from_array(pixels):
+    """Wrap an (h, w, 4) premultiplied RGBA array as a QImage without copying.
+    The array must stay alive while the QImage is in use (the page cache holds it).
+    """
+    h, w = pixels.shape[:2]
+    return QImage(pixels.data, w, h, 4 * w, QImage.Format_RGBA8888_Premultiplied)
+
+
+def _worker_document(pdf_path):
+    """Return the render worker's own fitz.Document for pdf_path, opened on first use."""
+    doc = _worker_docs.get(pdf_path)
+    if doc is None:
+        doc = _worker_docs[pdf_path] = fitz.open(pdf_path)
+    return doc
+
+
+class RenderToken:
+    """Cancellation handle for all render tasks queued for one zoom level."""
+    def __init__(self):
+        self.cancelled = False
+        self.futures = set()
+
+    def track(self, future):
+        self.futures.add(future)
+        future.add_done_callback(self.futures.discard)
+
+    def cancel(self):
+        """Drop tasks still waiting for a worker; pages already rendering finish into the cache."""
+        self.cancelled = True
+        for future in list(self.futures):
+            future.cancel()
+
+
+class RenderSignals(QObject):
+    # page index, render scale, RenderToken, (h, w, 4) uint8 pixel array
+    page_rendered = pyqtSignal(int, float, object, object)
+    page_failed = pyqtSignal(int, float, object, str)    # page index, render scale, RenderToken, error
+    page_stored = pyqtSignal()   # a worker is writing a page to the disk cache
+
+    def deliver(self, index, render_scale, token, future):
+        """Future callback (executor thread): forward the pixels to the GUI thread."""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self.page_failed.emit(index, render_scale, token, str(error) or type(error).__name__)
+            return
+        pixels, stored = future.result()
+        self.page_rendered.emit(index, render_scale, token, pixels)
+        if stored:
+            self.page_stored.emit()
+
+
+class RenderTask:
+    """Rasterize one page in a render worker process and return the pixels.
+    Pickled to the worker, so it only carries plain data (no Qt objects).
+    """
+    def __init__(self, pdf_path, index, render_scale, cache_dir=None):
+        self.pdf_path = pdf_path
+        self.index = index
+        self.render_scale = render_scale
+        self.cache_path = None
+        if cache_dir is not None:
+            self.cache_path = os.path.join(cache_dir, f"p{index}_s{render_scale:.3f}.npz")
+
+    def run(self):
+        """Returns (pixels, stored); stored is True if the page is being written to the disk cache."""
+        global _worker_disk_writer
+        pixels = self.load_cached()
+        if pixels is not None:
+            return pixels, False
+        pixels = self.rasterize()
+        if self.cache_path is None:
+            return pixels, False
+        # the write happens while the pixels travel to the GUI, not before they are sent
+        if _worker_disk_writer is None:
+            _worker_disk_writer = ThreadPoolExecutor(max_workers=1)
+        _worker_disk_writer.submit(self.store_cached, pixels)
+        return pixels, True
+
+    def load_cached(self):
+        """Pixels from an earlier session, or None. Inflating the .npz is far faster than re-rasterizing."""
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with np.load(self.cache_path) as data:
+                pixels = data["pixels"]
+            os.utime(self.cache_path)   # mark as recently used for sweep_disk_cache (atime may be off)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+        return pixels
+
+    def store_cached(self, pixels):
+        """Write the page to the disk cache (on the worker process's writer thread)."""
+        if self.cache_path is None:
+            return
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            # pages are mostly white: deflate shrinks a ~20 MB page to tens of KB
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(f, pixels=pixels)
+            os.replace(tmp_path, self.cache_path)   # readers never see a half-written file
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def rasterize(self):
+        global _worker_last_scale
+        if self.render_scale != _worker_last_scale:
+            # a new zoom level: trim MuPDF's store, which otherwise keeps growing with
+            # every zoom level (up to 256 MB by default); the pixels live in page_cache
+            fitz.TOOLS.store_shrink(100)
+            _worker_last_scale = self.render_scale
+        doc = _worker_document(self.pdf_path)
+        mat = fitz.Matrix(self.render_scale, self.render_scale)
+        # RGBA (stride == width * 4) is Qt's fast blit path; RGB888 gets converted on every draw
+        pix = doc[self.index].get_pixmap(matrix=mat, alpha=True)
+        # samples_mv is a view into MuPDF's buffer: one copy into numpy, no intermediate
+        # bytes object or QImage.copy()
+        pixels = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.width, 4).copy()
+        pix = None  # free the MuPDF pixmap now rather than when the worker picks up the next page
+        return pixels
+
+
+class SweepDiskCacheTask(QRunnable):
+    """Run sweep_disk_cache() on a pool thread; walking the cache directory can take a while."""
+    def __init__(self, max_bytes):
+        super().__init__()
+        self.max_bytes = max_bytes
+
+    def run(self):
+        sweep_disk_cache(max_bytes=self.max_bytes)
+
+
+class SaveAnchorsTask(QRunnable):
+    """Write the anchors JSON on a pool thread so a slow disk doesn't stall the UI."""
+    def __init__(self, path, anchors):
+        super().__init__()
+        self.path = path
+        self.anchors = anchors
+
+    def run(self):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self.anchors, f, indent=2)
+            os.replace(tmp_path, self.path)   # never leave a half-written anchors file behind
+        except OSError as e:
+            print(f"⚠️ Could not save anchors to {self.path}: {e}")
+            return
+        print(f"💾 Anchors saved to {self.path}")
+
+
 if __name__ == "__main__":
     import sys
     app = QApplication(sys.argv)